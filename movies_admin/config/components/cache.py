@@ -0,0 +1,7 @@
+# Shared by all workers so cache invalidation reaches every process, create it with `manage.py createcachetable`.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'django_cache',
+    }
+}
@@ -1,8 +1,21 @@
+import psycopg2
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+from django.core.exceptions import PermissionDenied
+from django.db import DatabaseError
+from django.db.models import Count, F, Q
+from django.forms.models import BaseInlineFormSet
+from django.template.response import TemplateResponse
+from django.urls import path
 from django.utils.translation import gettext_lazy as _
 
+from .filters import CreationDecadeListFilter, RatingListFilter, TypeListFilter
+from .forms import FilmworkImportForm
+from .importer import REPORT_SAMPLE_SIZE, FilmworkImportError, import_filmworks
 from .models import Filmwork, Genre, Person, GenreFilmwork, PersonFilmwork
 
+_FILMOGRAPHY_LIMIT = 50
+
 
 class GenreFilmworkInline(admin.TabularInline):
     model = GenreFilmwork
@@ -14,11 +27,59 @@ class PersonFilmworkInline(admin.TabularInline):
     autocomplete_fields = ('person',)
 
 
+class FilmCountChangeList(ChangeList):
+    """Film counts are added to the rows of the current page only,
+    so the count, change, delete and autocomplete queries stay plain."""
+    def get_results(self, request):
+        super().get_results(request)
+        self.model_admin.add_film_counts(self.result_list)
+
+
+class FilmographyFormSet(BaseInlineFormSet):
+    def get_queryset(self):
+        if not hasattr(self, '_filmography'):
+            self._filmography = super().get_queryset()[:_FILMOGRAPHY_LIMIT]
+        return self._filmography
+
+
+class FilmographyInline(admin.TabularInline):
+    """Read-only list of the latest films, the full count is shown on the changelist.
+    Ordering by film date still sorts all links of the person or genre before the limit is applied."""
+    formset = FilmographyFormSet
+    ordering = (F('film_work__creation_date').desc(nulls_last=True),)
+    extra = 0
+    can_delete = False
+    verbose_name_plural = _('filmography')
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('film_work')
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+class GenreFilmographyInline(FilmographyInline):
+    model = GenreFilmwork
+    fields = ('film_work',)
+
+
+class PersonFilmographyInline(FilmographyInline):
+    model = PersonFilmwork
+    fields = ('film_work', 'role')
+
+
 @admin.register(Filmwork)
 class FilmworkAdmin(admin.ModelAdmin):
     inlines = (GenreFilmworkInline, PersonFilmworkInline)
+    change_list_template = 'admin/movies/filmwork/change_list.html'
     list_display = ('title', 'type', 'creation_date', 'rating', 'genre_list', 'person_list')
-    list_filter = ('type',)
+    list_filter = (TypeListFilter, CreationDecadeListFilter, RatingListFilter)
     search_fields = ('title', 'description', 'id')
 
     list_prefetch_related = ('genres', 'personas')
@@ -39,14 +100,92 @@ class FilmworkAdmin(admin.ModelAdmin):
     def person_list(self, obj):
         return ', '.join([person.full_name for person in obj.personas.all()])
 
+    def get_urls(self):
+        import_url = path('import/', self.admin_site.admin_view(self.import_view), name='movies_filmwork_import')
+        return [import_url] + super().get_urls()
+
+    def import_view(self, request):
+        if not (self.has_add_permission(request) and self.has_change_permission(request)):
+            raise PermissionDenied
+        form = FilmworkImportForm(request.POST or None, request.FILES or None)
+        report = None
+        if form.is_valid():
+            try:
+                report = import_filmworks(form.cleaned_data['file'], dry_run=form.cleaned_data['dry_run'])
+            except (FilmworkImportError, DatabaseError, psycopg2.Error) as e:
+                form.add_error('file', str(e))
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': _('import filmworks'),
+            'form': form,
+            'report': report,
+            'sample_size': REPORT_SAMPLE_SIZE,
+        }
+        return TemplateResponse(request, 'admin/movies/filmwork/import.html', context)
+
 
 @admin.register(Genre)
 class GenreAdmin(admin.ModelAdmin):
-    list_display = ('name', 'description',)
+    inlines = (GenreFilmographyInline,)
+    list_display = ('name', 'description', 'film_count')
     search_fields = ('name',)
 
+    def get_changelist(self, request, **kwargs):
+        return FilmCountChangeList
+
+    def add_film_counts(self, genres):
+        counts = dict(
+            GenreFilmwork.objects
+            .filter(genre_id__in=[genre.id for genre in genres])
+            .values_list('genre_id')
+            .annotate(Count('id'))
+        )
+        for genre in genres:
+            genre.film_count = counts.get(genre.id, 0)
+
+    @admin.display(description=_('filmworks'))
+    def film_count(self, obj):
+        return obj.film_count
+
 
 @admin.register(Person)
 class PersonAdmin(admin.ModelAdmin):
-    list_display = ('full_name',)
+    inlines = (PersonFilmographyInline,)
+    list_display = ('full_name', 'actor_count', 'director_count', 'writer_count')
     search_fields = ('full_name',)
+
+    def get_changelist(self, request, **kwargs):
+        return FilmCountChangeList
+
+    def add_film_counts(self, persons):
+        counts = {
+            row['person_id']: row
+            for row in (
+                PersonFilmwork.objects
+                .filter(person_id__in=[person.id for person in persons])
+                .values('person_id')
+                .annotate(
+                    actor_count=Count('id', filter=Q(role=PersonFilmwork.RoleType.actor)),
+                    director_count=Count('id', filter=Q(role=PersonFilmwork.RoleType.director)),
+                    writer_count=Count('id', filter=Q(role=PersonFilmwork.RoleType.writer)),
+                )
+            )
+        }
+        for person in persons:
+            row = counts.get(person.id, {})
+            person.actor_count = row.get('actor_count', 0)
+            person.director_count = row.get('director_count', 0)
+            person.writer_count = row.get('writer_count', 0)
+
+    @admin.display(description=PersonFilmwork.RoleType.actor.label)
+    def actor_count(self, obj):
+        return obj.actor_count
+
+    @admin.display(description=PersonFilmwork.RoleType.director.label)
+    def director_count(self, obj):
+        return obj.director_count
+
+    @admin.display(description=PersonFilmwork.RoleType.writer.label)
+    def writer_count(self, obj):
+        return obj.writer_count
@@ -0,0 +1,51 @@
+from typing import List
+
+from django.db.models import Min, Q
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+
+from .models import ChangeFeedConsumer, FilmworkChange
+
+_BATCH_SIZE = 500
+
+# Every transaction with an id below the snapshot xmin has already finished, so rows
+# below this boundary can no longer appear and the consumer position never skips any.
+_COMMITTED_BOUNDARY = RawSQL('txid_snapshot_xmin(txid_current_snapshot())', [])
+
+
+def fetch_changes(consumer: str, batch_size: int = _BATCH_SIZE) -> List[FilmworkChange]:
+    """Return the next batch of changes the consumer has not acknowledged yet.
+    A change with the truncate operation means the consumer has to resync the whole catalogue."""
+    position, _ = ChangeFeedConsumer.objects.get_or_create(name=consumer)
+    after_position = (
+        Q(transaction_id__gt=position.last_transaction_id)
+        | Q(transaction_id=position.last_transaction_id, id__gt=position.last_change_id)
+    )
+    return list(
+        FilmworkChange.objects
+        .filter(after_position, transaction_id__lt=_COMMITTED_BOUNDARY)
+        .order_by('transaction_id', 'id')[:batch_size]
+    )
+
+
+def acknowledge(consumer: str, change: FilmworkChange) -> None:
+    """Move the consumer position past the given change, an older change never moves it back"""
+    ChangeFeedConsumer.objects.get_or_create(name=consumer)
+    before_change = (
+        Q(last_transaction_id__lt=change.transaction_id)
+        | Q(last_transaction_id=change.transaction_id, last_change_id__lt=change.id)
+    )
+    ChangeFeedConsumer.objects.filter(before_change, name=consumer).update(
+        last_transaction_id=change.transaction_id,
+        last_change_id=change.id,
+        modified=timezone.now(),
+    )
+
+
+def purge_acknowledged() -> int:
+    """Delete changes already acknowledged by every consumer, return the number of deleted rows"""
+    slowest = ChangeFeedConsumer.objects.aggregate(transaction_id=Min('last_transaction_id'))['transaction_id']
+    if slowest is None:
+        return 0
+    deleted, _ = FilmworkChange.objects.filter(transaction_id__lt=slowest).delete()
+    return deleted
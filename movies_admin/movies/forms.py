@@ -0,0 +1,16 @@
+from django import forms
+from django.utils.text import format_lazy
+from django.utils.translation import gettext_lazy as _
+
+from .importer import IMPORT_COLUMNS
+
+
+class FilmworkImportForm(forms.Form):
+    file = forms.FileField(
+        label=_('file'),
+        help_text=format_lazy(
+            _('CSV with a header and columns: {columns}. Names in lists are separated by semicolons.'),
+            columns=', '.join(IMPORT_COLUMNS),
+        ),
+    )
+    dry_run = forms.BooleanField(label=_('dry run'), required=False, initial=True)
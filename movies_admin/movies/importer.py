@@ -0,0 +1,303 @@
+import csv
+from dataclasses import dataclass, field, fields
+from typing import IO, List, Tuple
+
+from django.core.cache import cache
+from django.db import connections, router, transaction
+from django.utils.translation import gettext_lazy as _
+
+from .filters import FACETS_CACHE_KEY
+from .models import Filmwork
+
+# Partner files are CSV with a header and these columns in this order, lists of names are separated by ';'.
+IMPORT_COLUMNS = (
+    'title', 'description', 'creation_date', 'file_path', 'rating', 'type', 'genres', 'actors', 'directors', 'writers',
+)
+REPORT_SAMPLE_SIZE = 50
+
+_CREATE_STAGING_SQL = """
+    CREATE TEMPORARY TABLE filmwork_import (
+        title TEXT NOT NULL,
+        description TEXT,
+        creation_date DATE,
+        file_path TEXT,
+        rating FLOAT,
+        type TEXT NOT NULL,
+        genres TEXT,
+        actors TEXT,
+        directors TEXT,
+        writers TEXT,
+        film_work_id uuid,
+        is_new BOOLEAN NOT NULL DEFAULT false,
+        changed_fields TEXT[] NOT NULL DEFAULT '{}'
+    ) ON COMMIT DROP
+"""
+
+# The header is read and checked before COPY, so only data rows are left in the file.
+_COPY_SQL = (
+    f"COPY filmwork_import ({', '.join(IMPORT_COLUMNS)}) "
+    "FROM STDIN WITH (FORMAT csv, ENCODING 'UTF8')"
+)
+
+_INVALID_ROWS_SQL = """
+    SELECT COUNT(*)
+    FROM filmwork_import
+    WHERE type <> ALL(%s) OR rating < 0 OR rating > 100
+"""
+
+_DUPLICATE_ROWS_SQL = """
+    SELECT COUNT(*)
+    FROM (
+        SELECT 1
+        FROM filmwork_import
+        GROUP BY title, creation_date
+        HAVING COUNT(*) > 1
+    ) AS duplicates
+"""
+
+# Films are matched by title and creation date, the oldest film wins when several share them,
+# unmatched rows become new films.
+_MATCH_FILMS_SQL = """
+    UPDATE filmwork_import
+    SET film_work_id = film_work.id
+    FROM (
+        SELECT DISTINCT ON (title, creation_date) id, title, creation_date
+        FROM content.film_work
+        WHERE title IN (SELECT title FROM filmwork_import)
+        ORDER BY title, creation_date, created, id
+    ) AS film_work
+    WHERE film_work.title = filmwork_import.title
+      AND film_work.creation_date IS NOT DISTINCT FROM filmwork_import.creation_date
+"""
+
+_NEW_FILMS_SQL = """
+    UPDATE filmwork_import
+    SET film_work_id = gen_random_uuid(), is_new = true
+    WHERE film_work_id IS NULL
+"""
+
+_INSERT_FILMS_SQL = """
+    INSERT INTO content.film_work (id, title, description, creation_date, file_path, rating, type, created, modified)
+    SELECT film_work_id, title, description, creation_date, file_path, rating, type, now(), now()
+    FROM filmwork_import
+    WHERE is_new
+"""
+
+# A blank cell is read as NULL and keeps the existing value, so partial files never wipe films.
+_DIFF_FILMS_SQL = """
+    UPDATE filmwork_import
+    SET changed_fields = array_remove(ARRAY[
+        CASE WHEN film_work.description IS DISTINCT FROM COALESCE(filmwork_import.description, film_work.description)
+            THEN 'description' END,
+        CASE WHEN film_work.file_path IS DISTINCT FROM COALESCE(filmwork_import.file_path, film_work.file_path)
+            THEN 'file_path' END,
+        CASE WHEN film_work.rating IS DISTINCT FROM COALESCE(filmwork_import.rating, film_work.rating)
+            THEN 'rating' END,
+        CASE WHEN film_work.type IS DISTINCT FROM filmwork_import.type THEN 'type' END
+    ], NULL)
+    FROM content.film_work
+    WHERE NOT filmwork_import.is_new
+      AND film_work.id = filmwork_import.film_work_id
+"""
+
+_UPDATE_FILMS_SQL = """
+    UPDATE content.film_work
+    SET description = COALESCE(filmwork_import.description, film_work.description),
+        file_path = COALESCE(filmwork_import.file_path, film_work.file_path),
+        rating = COALESCE(filmwork_import.rating, film_work.rating),
+        type = filmwork_import.type,
+        modified = now()
+    FROM filmwork_import
+    WHERE cardinality(filmwork_import.changed_fields) > 0
+      AND film_work.id = filmwork_import.film_work_id
+"""
+
+_NEW_FILMS_SAMPLE_SQL = """
+    SELECT title
+    FROM filmwork_import
+    WHERE is_new
+    ORDER BY title
+    LIMIT %s
+"""
+
+_UPDATED_FILMS_SAMPLE_SQL = """
+    SELECT title, changed_fields
+    FROM filmwork_import
+    WHERE cardinality(changed_fields) > 0
+    ORDER BY title
+    LIMIT %s
+"""
+
+_STAGE_GENRES_SQL = """
+    CREATE TEMPORARY TABLE genre_import ON COMMIT DROP AS
+    SELECT DISTINCT film_work_id, trim(name) AS name
+    FROM filmwork_import, unnest(string_to_array(genres, ';')) AS name
+    WHERE trim(name) <> ''
+"""
+
+_STAGE_PERSONS_SQL = """
+    CREATE TEMPORARY TABLE person_import ON COMMIT DROP AS
+    SELECT DISTINCT film_work_id, trim(name) AS name, credit.role
+    FROM filmwork_import
+    CROSS JOIN LATERAL (VALUES ('actor', actors), ('director', directors), ('writer', writers)) AS credit(role, names)
+    CROSS JOIN LATERAL unnest(string_to_array(credit.names, ';')) AS name
+    WHERE trim(name) <> ''
+"""
+
+_NEW_GENRES_SAMPLE_SQL = """
+    SELECT DISTINCT name
+    FROM genre_import
+    WHERE NOT EXISTS (SELECT 1 FROM content.genre WHERE genre.name = genre_import.name)
+    ORDER BY name
+    LIMIT %s
+"""
+
+_NEW_PERSONS_SAMPLE_SQL = """
+    SELECT DISTINCT name
+    FROM person_import
+    WHERE NOT EXISTS (SELECT 1 FROM content.person WHERE person.full_name = person_import.name)
+    ORDER BY name
+    LIMIT %s
+"""
+
+_INSERT_GENRES_SQL = """
+    INSERT INTO content.genre (id, name, created, modified)
+    SELECT gen_random_uuid(), name, now(), now()
+    FROM (SELECT DISTINCT name FROM genre_import) AS genre_import
+    WHERE NOT EXISTS (SELECT 1 FROM content.genre WHERE genre.name = genre_import.name)
+"""
+
+_INSERT_PERSONS_SQL = """
+    INSERT INTO content.person (id, full_name, created, modified)
+    SELECT gen_random_uuid(), name, now(), now()
+    FROM (SELECT DISTINCT name FROM person_import) AS person_import
+    WHERE NOT EXISTS (SELECT 1 FROM content.person WHERE person.full_name = person_import.name)
+"""
+
+# Names are not unique, the oldest record with the name wins.
+_INSERT_GENRE_LINKS_SQL = """
+    INSERT INTO content.genre_film_work (id, film_work_id, genre_id, created)
+    SELECT gen_random_uuid(), genre_import.film_work_id, genre.id, now()
+    FROM genre_import
+    JOIN (
+        SELECT DISTINCT ON (name) id, name
+        FROM content.genre
+        WHERE name IN (SELECT name FROM genre_import)
+        ORDER BY name, created
+    ) AS genre USING (name)
+    ON CONFLICT DO NOTHING
+"""
+
+_INSERT_PERSON_LINKS_SQL = """
+    INSERT INTO content.person_film_work (id, film_work_id, person_id, role, created)
+    SELECT gen_random_uuid(), person_import.film_work_id, person.id, person_import.role, now()
+    FROM person_import
+    JOIN (
+        SELECT DISTINCT ON (full_name) id, full_name AS name
+        FROM content.person
+        WHERE full_name IN (SELECT name FROM person_import)
+        ORDER BY full_name, created
+    ) AS person USING (name)
+    ON CONFLICT DO NOTHING
+"""
+
+
+class FilmworkImportError(Exception):
+    pass
+
+
+@dataclass
+class ImportReport:
+    dry_run: bool
+    rows: int = 0
+    films_created: int = 0
+    films_updated: int = 0
+    genres_created: int = 0
+    persons_created: int = 0
+    genre_links_created: int = 0
+    person_links_created: int = 0
+    created_films: List[str] = field(default_factory=list)
+    updated_films: List[Tuple[str, List[str]]] = field(default_factory=list)
+    created_genres: List[str] = field(default_factory=list)
+    created_persons: List[str] = field(default_factory=list)
+
+    def items(self):
+        labels = {
+            'rows': _('rows'),
+            'films_created': _('films created'),
+            'films_updated': _('films updated'),
+            'genres_created': _('genres created'),
+            'persons_created': _('persons created'),
+            'genre_links_created': _('genre links created'),
+            'person_links_created': _('person links created'),
+        }
+        return [(labels[item.name], getattr(self, item.name)) for item in fields(self) if item.name in labels]
+
+
+def _check_header(file: IO[bytes]) -> None:
+    header = next(csv.reader([file.readline().decode('utf-8-sig', errors='replace')]), [])
+    if header != list(IMPORT_COLUMNS):
+        raise FilmworkImportError(_('Expected columns %(expected)s, got %(header)s')
+                                  % {'expected': ', '.join(IMPORT_COLUMNS), 'header': ', '.join(header)})
+
+
+def _fetch_column(cursor, sql: str) -> List[str]:
+    cursor.execute(sql, [REPORT_SAMPLE_SIZE])
+    return [row[0] for row in cursor.fetchall()]
+
+
+def import_filmworks(file: IO[bytes], dry_run: bool = True) -> ImportReport:
+    """Merge films with their genres and persons from a partner CSV in a single transaction,
+    rolled back when dry_run is set so the report only shows what would change.
+    The report lists at most REPORT_SAMPLE_SIZE films and names of each kind."""
+    _check_header(file)
+    report = ImportReport(dry_run=dry_run)
+    using = router.db_for_write(Filmwork)
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        cursor.execute(_CREATE_STAGING_SQL)
+        cursor.copy_expert(_COPY_SQL, file)
+        cursor.execute('SELECT COUNT(*) FROM filmwork_import')
+        report.rows = cursor.fetchone()[0]
+        cursor.execute(_INVALID_ROWS_SQL, [list(Filmwork.FilmworkType.values)])
+        invalid_rows = cursor.fetchone()[0]
+        if invalid_rows:
+            raise FilmworkImportError(_('%(count)s rows have an unknown type or a rating out of 0..100')
+                                      % {'count': invalid_rows})
+        cursor.execute(_DUPLICATE_ROWS_SQL)
+        duplicates = cursor.fetchone()[0]
+        if duplicates:
+            raise FilmworkImportError(_('%(count)s titles with the same creation date occur more than once')
+                                      % {'count': duplicates})
+
+        cursor.execute(_MATCH_FILMS_SQL)
+        cursor.execute(_NEW_FILMS_SQL)
+        cursor.execute(_DIFF_FILMS_SQL)
+        report.created_films = _fetch_column(cursor, _NEW_FILMS_SAMPLE_SQL)
+        cursor.execute(_UPDATED_FILMS_SAMPLE_SQL, [REPORT_SAMPLE_SIZE])
+        report.updated_films = [
+            (title, [Filmwork._meta.get_field(name).verbose_name for name in changed_fields])
+            for title, changed_fields in cursor.fetchall()
+        ]
+        cursor.execute(_INSERT_FILMS_SQL)
+        report.films_created = cursor.rowcount
+        cursor.execute(_UPDATE_FILMS_SQL)
+        report.films_updated = cursor.rowcount
+
+        cursor.execute(_STAGE_GENRES_SQL)
+        cursor.execute(_STAGE_PERSONS_SQL)
+        report.created_genres = _fetch_column(cursor, _NEW_GENRES_SAMPLE_SQL)
+        report.created_persons = _fetch_column(cursor, _NEW_PERSONS_SAMPLE_SQL)
+        cursor.execute(_INSERT_GENRES_SQL)
+        report.genres_created = cursor.rowcount
+        cursor.execute(_INSERT_PERSONS_SQL)
+        report.persons_created = cursor.rowcount
+        cursor.execute(_INSERT_GENRE_LINKS_SQL)
+        report.genre_links_created = cursor.rowcount
+        cursor.execute(_INSERT_PERSON_LINKS_SQL)
+        report.person_links_created = cursor.rowcount
+
+        if dry_run:
+            transaction.set_rollback(True, using=using)
+        else:
+            transaction.on_commit(lambda: cache.delete(FACETS_CACHE_KEY), using=using)
+    return report
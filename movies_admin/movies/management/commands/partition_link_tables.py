@@ -0,0 +1,93 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, router, transaction
+
+from movies.models import GenreFilmwork
+
+LINK_TABLES = ('genre_film_work', 'person_film_work')
+
+
+def _get_partition_count(cursor, table):
+    cursor.execute(
+        'SELECT COUNT(*) FROM pg_inherits WHERE inhparent = %s::regclass',
+        [f'content.{table}'],
+    )
+    return cursor.fetchone()[0]
+
+
+def _is_partitioned(cursor, table):
+    cursor.execute(
+        'SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass)',
+        [f'content.{table}'],
+    )
+    return cursor.fetchone()[0]
+
+
+def _rebuild_link_table(cursor, table, partitions):
+    """Recreate the link table, hash partitioned by film_work_id when partitions > 0, keeping its data,
+    constraints, indexes and triggers"""
+    cursor.execute(
+        """
+        SELECT conname, pg_get_constraintdef(oid)
+        FROM pg_constraint
+        WHERE conrelid = %s::regclass AND contype IN ('u', 'f')
+        """,
+        [f'content.{table}'],
+    )
+    constraints = cursor.fetchall()
+    cursor.execute(
+        """
+        SELECT pg_get_indexdef(indexrelid)
+        FROM pg_index
+        WHERE indrelid = %s::regclass
+          AND NOT indisprimary
+          AND NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conindid = pg_index.indexrelid)
+        """,
+        [f'content.{table}'],
+    )
+    indexes = [indexdef.replace(' ON ONLY ', ' ON ') for indexdef, in cursor.fetchall()]
+    cursor.execute(
+        'SELECT pg_get_triggerdef(oid) FROM pg_trigger WHERE tgrelid = %s::regclass AND NOT tgisinternal',
+        [f'content.{table}'],
+    )
+    triggers = [triggerdef for triggerdef, in cursor.fetchall()]
+
+    partition_clause = ' PARTITION BY HASH (film_work_id)' if partitions else ''
+    cursor.execute(f'CREATE TABLE content.{table}_new (LIKE content.{table} INCLUDING DEFAULTS){partition_clause}')
+    for remainder in range(partitions):
+        cursor.execute(
+            f'CREATE TABLE content.{table}_new_p{remainder} PARTITION OF content.{table}_new '
+            f'FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})'
+        )
+    cursor.execute(f'INSERT INTO content.{table}_new SELECT * FROM content.{table}')
+    cursor.execute(f'DROP TABLE content.{table}')
+    cursor.execute(f'ALTER TABLE content.{table}_new RENAME TO {table}')
+    for remainder in range(partitions):
+        cursor.execute(f'ALTER TABLE content.{table}_new_p{remainder} RENAME TO {table}_p{remainder}')
+
+    # A primary key of a partitioned table has to include the partition key.
+    primary_key = 'id, film_work_id' if partitions else 'id'
+    cursor.execute(f'ALTER TABLE content.{table} ADD PRIMARY KEY ({primary_key})')
+    for name, definition in constraints:
+        cursor.execute(f'ALTER TABLE content.{table} ADD CONSTRAINT {name} {definition}')
+    for statement in indexes + triggers:
+        cursor.execute(statement)
+
+
+class Command(BaseCommand):
+    help = 'Hash partition the genre/person link tables by film_work_id into N partitions, 0 makes them plain tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('partitions', type=int)
+
+    def handle(self, *args, partitions, **options):
+        if partitions < 0:
+            raise CommandError('The number of partitions cannot be negative')
+        using = router.db_for_write(GenreFilmwork)
+        with transaction.atomic(using=using), connections[using].cursor() as cursor:
+            for table in LINK_TABLES:
+                current = _get_partition_count(cursor, table) if _is_partitioned(cursor, table) else 0
+                if current == partitions:
+                    self.stdout.write(f'{table} already has {partitions} partitions')
+                    continue
+                _rebuild_link_table(cursor, table, partitions)
+                self.stdout.write(self.style.SUCCESS(f'{table} rebuilt with {partitions} partitions'))
@@ -0,0 +1,39 @@
+from django.conf import settings
+
+from .routers import primary_pinned, replica_reads_allowed
+
+_PRIMARY_PINNED_COOKIE = 'primary_pinned'
+_SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+_REPLICA_URL_NAMES = ('autocomplete',)
+_REPLICA_URL_NAME_SUFFIXES = ('_changelist',)
+
+
+class ReplicaRoutingMiddleware:
+    """Allows replica reads for safe admin list, search and autocomplete requests and keeps
+    the client on the primary for a while after an unsafe request"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        allowed_token = replica_reads_allowed.set(False)
+        is_unsafe = request.method not in _SAFE_METHODS
+        pinned_token = primary_pinned.set(is_unsafe or _PRIMARY_PINNED_COOKIE in request.COOKIES)
+        try:
+            response = self.get_response(request)
+            if is_unsafe:
+                response.set_cookie(
+                    _PRIMARY_PINNED_COOKIE, '1', max_age=settings.DB_REPLICA_PIN_SECONDS, httponly=True, samesite='Lax'
+                )
+            return response
+        finally:
+            replica_reads_allowed.reset(allowed_token)
+            primary_pinned.reset(pinned_token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        url_name = request.resolver_match.url_name or ''
+        if request.method in _SAFE_METHODS and (
+            url_name in _REPLICA_URL_NAMES or url_name.endswith(_REPLICA_URL_NAME_SUFFIXES)
+        ):
+            replica_reads_allowed.set(True)
+        return None
@@ -0,0 +1,97 @@
+from django.db import migrations, models
+
+
+LOG_FILM_WORK_CHANGE_SQL = """
+CREATE OR REPLACE FUNCTION content.log_film_work_change()
+RETURNS TRIGGER AS $$
+DECLARE
+    changed RECORD;
+    changed_film_work_id uuid;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        changed := OLD;
+    ELSE
+        changed := NEW;
+    END IF;
+
+    IF TG_TABLE_NAME = 'film_work' THEN
+        changed_film_work_id := changed.id;
+    ELSE
+        changed_film_work_id := changed.film_work_id;
+        IF TG_OP = 'UPDATE' AND OLD.film_work_id IS DISTINCT FROM NEW.film_work_id THEN
+            INSERT INTO content.film_work_change (film_work_id, source, operation, transaction_id, created)
+            VALUES (OLD.film_work_id, TG_TABLE_NAME, 'delete', txid_current(), now());
+        END IF;
+    END IF;
+
+    INSERT INTO content.film_work_change (film_work_id, source, operation, transaction_id, created)
+    VALUES (changed_film_work_id, TG_TABLE_NAME, lower(TG_OP), txid_current(), now());
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER log_film_work_change AFTER INSERT OR UPDATE OR DELETE
+ON content.film_work
+FOR EACH ROW EXECUTE PROCEDURE content.log_film_work_change();
+
+CREATE TRIGGER log_genre_film_work_change AFTER INSERT OR UPDATE OR DELETE
+ON content.genre_film_work
+FOR EACH ROW EXECUTE PROCEDURE content.log_film_work_change();
+
+CREATE TRIGGER log_person_film_work_change AFTER INSERT OR UPDATE OR DELETE
+ON content.person_film_work
+FOR EACH ROW EXECUTE PROCEDURE content.log_film_work_change();
+"""
+
+DROP_LOG_FILM_WORK_CHANGE_SQL = """
+DROP TRIGGER IF EXISTS log_person_film_work_change ON content.person_film_work;
+DROP TRIGGER IF EXISTS log_genre_film_work_change ON content.genre_film_work;
+DROP TRIGGER IF EXISTS log_film_work_change ON content.film_work;
+DROP FUNCTION IF EXISTS content.log_film_work_change();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0003_alter_filmwork_creation_date_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeFeedConsumer',
+            fields=[
+                ('name', models.CharField(max_length=255, primary_key=True, serialize=False, verbose_name='name')),
+                ('last_transaction_id', models.BigIntegerField(default=0, verbose_name='last_transaction_id')),
+                ('last_change_id', models.BigIntegerField(default=0, verbose_name='last_change_id')),
+                ('modified', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'change feed consumer',
+                'verbose_name_plural': 'change feed consumers',
+                'db_table': 'content"."change_feed_consumer',
+            },
+        ),
+        migrations.CreateModel(
+            name='FilmworkChange',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('film_work_id', models.UUIDField(verbose_name='film_work_id')),
+                ('source', models.TextField(verbose_name='source')),
+                ('operation', models.TextField(choices=[('insert', 'insert'), ('update', 'update'), ('delete', 'delete')], verbose_name='operation')),
+                ('transaction_id', models.BigIntegerField(verbose_name='transaction_id')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'filmwork change',
+                'verbose_name_plural': 'filmwork changes',
+                'db_table': 'content"."film_work_change',
+                'indexes': [models.Index(fields=['transaction_id', 'id'], name='film_work_change_position_idx')],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='filmwork',
+            index=models.Index(fields=['modified'], name='film_work_modified_idx'),
+        ),
+        migrations.RunSQL(LOG_FILM_WORK_CHANGE_SQL, DROP_LOG_FILM_WORK_CHANGE_SQL),
+    ]
@@ -0,0 +1,54 @@
+from django.db import migrations
+
+
+PASS_CHANGE_SOURCE_SQL = """
+CREATE OR REPLACE FUNCTION content.log_film_work_change()
+RETURNS TRIGGER AS $$
+DECLARE
+    changed RECORD;
+    changed_film_work_id uuid;
+    change_source TEXT := COALESCE(TG_ARGV[0], TG_TABLE_NAME);
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        changed := OLD;
+    ELSE
+        changed := NEW;
+    END IF;
+
+    IF TG_TABLE_NAME = 'film_work' THEN
+        changed_film_work_id := changed.id;
+    ELSE
+        changed_film_work_id := changed.film_work_id;
+        IF TG_OP = 'UPDATE' AND OLD.film_work_id IS DISTINCT FROM NEW.film_work_id THEN
+            INSERT INTO content.film_work_change (film_work_id, source, operation, transaction_id, created)
+            VALUES (OLD.film_work_id, change_source, 'delete', txid_current(), now());
+        END IF;
+    END IF;
+
+    INSERT INTO content.film_work_change (film_work_id, source, operation, transaction_id, created)
+    VALUES (changed_film_work_id, change_source, lower(TG_OP), txid_current(), now());
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS log_genre_film_work_change ON content.genre_film_work;
+CREATE TRIGGER log_genre_film_work_change AFTER INSERT OR UPDATE OR DELETE
+ON content.genre_film_work
+FOR EACH ROW EXECUTE PROCEDURE content.log_film_work_change('genre_film_work');
+
+DROP TRIGGER IF EXISTS log_person_film_work_change ON content.person_film_work;
+CREATE TRIGGER log_person_film_work_change AFTER INSERT OR UPDATE OR DELETE
+ON content.person_film_work
+FOR EACH ROW EXECUTE PROCEDURE content.log_film_work_change('person_film_work');
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0004_filmwork_changefeed'),
+    ]
+
+    operations = [
+        migrations.RunSQL(PASS_CHANGE_SOURCE_SQL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0006_filmwork_facet_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='personfilmwork',
+            index=models.Index(fields=['person', 'role'], name='person_film_work_person_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='genrefilmwork',
+            index=models.Index(fields=['genre', 'film_work'], name='genre_film_work_genre_idx'),
+        ),
+    ]
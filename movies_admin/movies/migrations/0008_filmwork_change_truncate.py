@@ -0,0 +1,53 @@
+from django.db import migrations, models
+
+
+LOG_FILM_WORK_TRUNCATE_SQL = """
+CREATE OR REPLACE FUNCTION content.log_film_work_truncate()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO content.film_work_change (film_work_id, source, operation, transaction_id, created)
+    VALUES (NULL, COALESCE(TG_ARGV[0], TG_TABLE_NAME), 'truncate', txid_current(), now());
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER log_film_work_truncate AFTER TRUNCATE
+ON content.film_work
+FOR EACH STATEMENT EXECUTE PROCEDURE content.log_film_work_truncate('film_work');
+
+CREATE TRIGGER log_genre_film_work_truncate AFTER TRUNCATE
+ON content.genre_film_work
+FOR EACH STATEMENT EXECUTE PROCEDURE content.log_film_work_truncate('genre_film_work');
+
+CREATE TRIGGER log_person_film_work_truncate AFTER TRUNCATE
+ON content.person_film_work
+FOR EACH STATEMENT EXECUTE PROCEDURE content.log_film_work_truncate('person_film_work');
+"""
+
+DROP_LOG_FILM_WORK_TRUNCATE_SQL = """
+DROP TRIGGER IF EXISTS log_person_film_work_truncate ON content.person_film_work;
+DROP TRIGGER IF EXISTS log_genre_film_work_truncate ON content.genre_film_work;
+DROP TRIGGER IF EXISTS log_film_work_truncate ON content.film_work;
+DROP FUNCTION IF EXISTS content.log_film_work_truncate();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0007_person_genre_reverse_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='filmworkchange',
+            name='film_work_id',
+            field=models.UUIDField(blank=True, null=True, verbose_name='film_work_id'),
+        ),
+        migrations.AlterField(
+            model_name='filmworkchange',
+            name='operation',
+            field=models.TextField(choices=[('insert', 'insert'), ('update', 'update'), ('delete', 'delete'), ('truncate', 'truncate')], verbose_name='operation'),
+        ),
+        migrations.RunSQL(LOG_FILM_WORK_TRUNCATE_SQL, DROP_LOG_FILM_WORK_TRUNCATE_SQL),
+    ]
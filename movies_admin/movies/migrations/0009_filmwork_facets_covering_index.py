@@ -0,0 +1,23 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0008_filmwork_change_truncate'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='filmwork',
+            name='film_work_type_creation_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='filmwork',
+            name='film_work_type_rating_idx',
+        ),
+        migrations.AddIndex(
+            model_name='filmwork',
+            index=models.Index(fields=['type', 'creation_date', 'rating'], name='film_work_facets_idx'),
+        ),
+    ]
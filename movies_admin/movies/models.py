@@ -66,6 +66,9 @@ class Filmwork(TimeStampedMixin, UUIDMixin):
         verbose_name_plural = _('filmworks')
         indexes = [
             models.Index(fields=['creation_date'], name='film_work_creation_date_idx'),
+            models.Index(fields=['modified'], name='film_work_modified_idx'),
+            models.Index(fields=['type', 'creation_date', 'rating'], name='film_work_facets_idx'),
+            models.Index(fields=['rating'], name='film_work_rating_idx'),
         ]
 
     def __str__(self):
@@ -88,6 +91,9 @@ class PersonFilmwork(UUIDMixin):
         constraints = [
             models.UniqueConstraint(fields=['film_work', 'person', 'role'], name='film_work_person_idx')
         ]
+        indexes = [
+            models.Index(fields=['person', 'role'], name='person_film_work_person_idx'),
+        ]
 
 
 class GenreFilmwork(UUIDMixin):
@@ -100,3 +106,49 @@ class GenreFilmwork(UUIDMixin):
         constraints = [
             models.UniqueConstraint(fields=['film_work', 'genre'], name='film_work_genre_idx')
         ]
+        indexes = [
+            models.Index(fields=['genre', 'film_work'], name='genre_film_work_genre_idx'),
+        ]
+
+
+class FilmworkChange(models.Model):
+    """Outbox row written by database triggers whenever a filmwork or its links change.
+    A truncate row has no filmwork and means the whole source table has been emptied."""
+
+    class Operation(models.TextChoices):
+        INSERT = "insert", _("insert")
+        UPDATE = "update", _("update")
+        DELETE = "delete", _("delete")
+        TRUNCATE = "truncate", _("truncate")
+
+    id = models.BigAutoField(primary_key=True)
+    film_work_id = models.UUIDField(_('film_work_id'), blank=True, null=True)
+    source = models.TextField(_('source'))
+    operation = models.TextField(_('operation'), choices=Operation.choices)
+    transaction_id = models.BigIntegerField(_('transaction_id'))
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "content\".\"film_work_change"
+        verbose_name = _('filmwork change')
+        verbose_name_plural = _('filmwork changes')
+        indexes = [
+            models.Index(fields=['transaction_id', 'id'], name='film_work_change_position_idx'),
+        ]
+
+
+class ChangeFeedConsumer(models.Model):
+    """Position of a downstream consumer in the filmwork changefeed."""
+
+    name = models.CharField(_('name'), max_length=255, primary_key=True)
+    last_transaction_id = models.BigIntegerField(_('last_transaction_id'), default=0)
+    last_change_id = models.BigIntegerField(_('last_change_id'), default=0)
+    modified = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "content\".\"change_feed_consumer"
+        verbose_name = _('change feed consumer')
+        verbose_name_plural = _('change feed consumers')
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,38 @@
+from contextvars import ContextVar
+
+from django.conf import settings
+
+REPLICA = 'replica'
+PRIMARY = 'default'
+
+replica_reads_allowed: ContextVar[bool] = ContextVar('replica_reads_allowed', default=False)
+primary_pinned: ContextVar[bool] = ContextVar('primary_pinned', default=False)
+
+
+class ReplicaRouter:
+    """Sends reads of the movies app to the replica when the current request allows it
+    and the client is not pinned to the primary, everything else goes to the primary"""
+
+    app_label = 'movies'
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label != self.app_label or REPLICA not in settings.DATABASES:
+            return None
+        if replica_reads_allowed.get() and not primary_pinned.get():
+            return REPLICA
+        return PRIMARY
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label != self.app_label:
+            return None
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if {obj1._state.db, obj2._state.db} <= {PRIMARY, REPLICA}:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == REPLICA:
+            return False
+        return None
@@ -0,0 +1,11 @@
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .filters import FACETS_CACHE_KEY
+from .models import Filmwork
+
+
+@receiver([post_save, post_delete], sender=Filmwork)
+def invalidate_filmwork_facets(**kwargs):
+    cache.delete(FACETS_CACHE_KEY)
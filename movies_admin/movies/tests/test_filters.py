@@ -0,0 +1,24 @@
+from unittest import mock
+
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.test import RequestFactory, SimpleTestCase
+
+from movies.filters import CreationDecadeListFilter
+from movies.models import Filmwork
+
+
+@mock.patch('movies.filters.get_filmwork_facets', return_value={})
+class CreationDecadeListFilterTests(SimpleTestCase):
+    def _filter(self, decade):
+        request = RequestFactory().get('/admin/movies/filmwork/', {'decade': decade})
+        return CreationDecadeListFilter(request, {'decade': decade}, Filmwork, None)
+
+    def test_decade_filters_by_half_open_range(self, _):
+        queryset = self._filter('1990').queryset(None, Filmwork.objects.all())
+        self.assertIn('"creation_date" >= 1990-01-01', str(queryset.query))
+        self.assertIn('"creation_date" < 2000-01-01', str(queryset.query))
+
+    def test_out_of_range_decades_are_rejected(self, _):
+        for decade in ('0', '-10', '9999', 'abc'):
+            with self.subTest(decade=decade), self.assertRaises(IncorrectLookupParameters):
+                self._filter(decade).queryset(None, Filmwork.objects.all())
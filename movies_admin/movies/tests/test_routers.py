@@ -0,0 +1,101 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import ResolverMatch
+
+from movies.middleware import ReplicaRoutingMiddleware
+from movies.models import Filmwork
+from movies.routers import PRIMARY, REPLICA, ReplicaRouter, primary_pinned, replica_reads_allowed
+
+WITH_REPLICA = {**settings.DATABASES, REPLICA: {**settings.DATABASES[PRIMARY], 'TEST': {'MIRROR': PRIMARY}}}
+WITHOUT_REPLICA = {PRIMARY: settings.DATABASES[PRIMARY]}
+
+
+@override_settings(DATABASES=WITH_REPLICA)
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.allowed_token = replica_reads_allowed.set(False)
+        self.pinned_token = primary_pinned.set(False)
+
+    def tearDown(self):
+        replica_reads_allowed.reset(self.allowed_token)
+        primary_pinned.reset(self.pinned_token)
+
+    def test_reads_go_to_primary_unless_allowed(self):
+        self.assertEqual(self.router.db_for_read(Filmwork), PRIMARY)
+
+    def test_allowed_reads_go_to_replica(self):
+        replica_reads_allowed.set(True)
+        self.assertEqual(self.router.db_for_read(Filmwork), REPLICA)
+
+    def test_pinned_reads_go_to_primary(self):
+        replica_reads_allowed.set(True)
+        primary_pinned.set(True)
+        self.assertEqual(self.router.db_for_read(Filmwork), PRIMARY)
+
+    def test_other_apps_are_not_routed(self):
+        replica_reads_allowed.set(True)
+        self.assertIsNone(self.router.db_for_read(User))
+        self.assertIsNone(self.router.db_for_write(User))
+
+    def test_write_goes_to_primary_without_pinning(self):
+        self.assertEqual(self.router.db_for_write(Filmwork), PRIMARY)
+        self.assertFalse(primary_pinned.get())
+
+    def test_replica_is_not_migrated(self):
+        self.assertFalse(self.router.allow_migrate(REPLICA, 'movies'))
+        self.assertIsNone(self.router.allow_migrate(PRIMARY, 'movies'))
+
+    @override_settings(DATABASES=WITHOUT_REPLICA)
+    def test_missing_replica_falls_back_to_default(self):
+        replica_reads_allowed.set(True)
+        self.assertIsNone(self.router.db_for_read(Filmwork))
+
+
+class ReplicaRoutingMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.seen = {}
+
+    def _call(self, request, url_name):
+        request.resolver_match = ResolverMatch(lambda request: None, (), {}, url_name=url_name)
+
+        def get_response(request):
+            middleware.process_view(request, request.resolver_match.func, (), {})
+            self.seen = {'allowed': replica_reads_allowed.get(), 'pinned': primary_pinned.get()}
+            return HttpResponse()
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        return middleware(request)
+
+    def test_changelist_get_allows_replica(self):
+        response = self._call(self.factory.get('/admin/movies/filmwork/'), 'movies_filmwork_changelist')
+        self.assertEqual(self.seen, {'allowed': True, 'pinned': False})
+        self.assertNotIn('primary_pinned', response.cookies)
+
+    def test_autocomplete_get_allows_replica(self):
+        self._call(self.factory.get('/admin/autocomplete/'), 'autocomplete')
+        self.assertTrue(self.seen['allowed'])
+
+    def test_change_form_get_does_not_pin(self):
+        response = self._call(self.factory.get('/admin/movies/filmwork/1/change/'), 'movies_filmwork_change')
+        self.assertEqual(self.seen, {'allowed': False, 'pinned': False})
+        self.assertNotIn('primary_pinned', response.cookies)
+
+    def test_post_pins_and_sets_cookie(self):
+        response = self._call(self.factory.post('/admin/movies/filmwork/'), 'movies_filmwork_changelist')
+        self.assertEqual(self.seen, {'allowed': False, 'pinned': True})
+        self.assertEqual(response.cookies['primary_pinned']['max-age'], settings.DB_REPLICA_PIN_SECONDS)
+
+    def test_cookie_pins_following_requests(self):
+        request = self.factory.get('/admin/movies/filmwork/')
+        request.COOKIES['primary_pinned'] = '1'
+        self._call(request, 'movies_filmwork_changelist')
+        self.assertTrue(self.seen['pinned'])
+
+    def test_state_is_reset_after_request(self):
+        self._call(self.factory.post('/admin/movies/filmwork/'), 'movies_filmwork_changelist')
+        self.assertFalse(replica_reads_allowed.get())
+        self.assertFalse(primary_pinned.get())
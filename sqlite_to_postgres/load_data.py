@@ -1,6 +1,8 @@
 import os
-from typing import Iterator
-from contextlib import contextmanager
+from typing import Iterator, List, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager, ExitStack
+from queue import Full, Queue
 import logging
 import sqlite3
 
@@ -10,15 +12,23 @@ from psycopg2.extras import DictCursor
 from dotenv import load_dotenv
 
 from loader import models
-from loader.db_executors import SQLiteExtractor, PostgresLoader
+from loader.db_executors import DataChunk, SQLiteExtractor, PostgresLoader, PartitioningError
 
 load_dotenv()
 psycopg2.extras.register_uuid()
+_PARTITION_QUEUE_SIZE = 10
+_QUEUE_PUT_TIMEOUT = 1
+
 logging.basicConfig(format="[%(asctime)s] [%(levelname)s] %(message)s", level=logging.INFO)
 
 
 def load_from_sqlite(sqlite_conn: sqlite3.Connection, pg_conn: _connection) -> None:
-    """Base method for loading data from SQLite to Postgres"""
+    """Base method for loading data from SQLite to Postgres
+
+    Everything is loaded in one transaction unless a link table is partitioned. Partitions are filled
+    by separate connections which must see the films, so the other tables are committed first and a
+    failure while filling partitions leaves the partitioned tables empty until the script is rerun.
+    """
     sqlite_extractor = SQLiteExtractor(sqlite_conn)
     postgres_loader = PostgresLoader(pg_conn)
 
@@ -29,13 +39,68 @@ def load_from_sqlite(sqlite_conn: sqlite3.Connection, pg_conn: _connection) -> N
         models.Table("genre_film_work", models.GenreFilmwork),
         models.Table("person_film_work", models.PersonFilmwork),
     )
+    partitioned_tables = []
     for table in tables:
         logging.info(f"Starting loading data for table: {table.name}")
         postgres_loader.truncate_table(table)
+        partitions = postgres_loader.get_partitions(table)
+        if partitions:
+            partitioned_tables.append((table, partitions))
+            continue
         for data_chunk in sqlite_extractor.extract_from_table(table):
             postgres_loader.load_to_table(table, data_chunk)
     pg_conn.commit()
 
+    for table, partitions in partitioned_tables:
+        logging.info(f"Starting parallel loading data for partitions of table: {table.name}")
+        _load_partitions(sqlite_extractor, postgres_loader, table, partitions)
+
+
+def _load_partitions(sqlite_extractor: SQLiteExtractor, postgres_loader: PostgresLoader,
+                     table: models.Table, partitions: List[models.Partition]) -> None:
+    """Extract the table once and fan the rows out to one worker per partition.
+    Workers commit only after all of them have loaded their rows, so a failed load leaves the partitions
+    empty. The commits themselves run one after another, a failure between them is not rolled back."""
+    chunk_queues = {partition: Queue(maxsize=_PARTITION_QUEUE_SIZE) for partition in partitions}
+    with ExitStack() as stack, ThreadPoolExecutor(max_workers=len(partitions)) as executor:
+        partition_conns = [stack.enter_context(_get_pg_conn()) for _ in partitions]
+        futures = {
+            partition: executor.submit(_load_partition, table, partition, chunk_queues[partition], conn)
+            for partition, conn in zip(partitions, partition_conns)
+        }
+        try:
+            for data_chunk in sqlite_extractor.extract_from_table(table):
+                if any(future.done() for future in futures.values()):
+                    break
+                for partition, partition_chunk in postgres_loader.split_by_partition(
+                        table, partitions, data_chunk).items():
+                    _put_chunk(chunk_queues[partition], partition_chunk, futures[partition])
+        finally:
+            for partition, chunk_queue in chunk_queues.items():
+                _put_chunk(chunk_queue, None, futures[partition])
+        for future in futures.values():
+            future.result()
+        for conn in partition_conns:
+            conn.commit()
+
+
+def _put_chunk(chunk_queue: Queue, data_chunk: Optional[DataChunk], worker: Future) -> None:
+    """Block while the worker is busy, but give up once it has stopped, so a failed worker cannot deadlock"""
+    while True:
+        try:
+            chunk_queue.put(data_chunk, timeout=_QUEUE_PUT_TIMEOUT)
+            return
+        except Full:
+            if worker.done():
+                return
+
+
+def _load_partition(table: models.Table, partition: models.Partition, chunk_queue: Queue, pg_conn: _connection) -> None:
+    postgres_loader = PostgresLoader(pg_conn)
+    postgres_loader.set_constraints_immediate()
+    while (data_chunk := chunk_queue.get()) is not None:
+        postgres_loader.load_to_table(table, data_chunk, partition)
+
 
 @contextmanager
 def _get_sqlite_conn(db_path: str) -> Iterator[sqlite3.Connection]:
@@ -68,5 +133,5 @@ if __name__ == "__main__":
         logging.info("Starting loading data")
         try:
             load_from_sqlite(sqlite_conn, pg_conn)
-        except (psycopg2.Error, sqlite3.Error) as e:
+        except (psycopg2.Error, sqlite3.Error, PartitioningError) as e:
             logging.error(f"Error has occurred when loaded data: {e}")
@@ -1,12 +1,19 @@
+from collections import defaultdict
 from dataclasses import fields, astuple
-from typing import List, Iterator
+from typing import Dict, List, Iterator, Optional
 from uuid import UUID
+import re
 import psycopg2
 
-from .models import TableDataClass, Table
+from .models import TableDataClass, Table, Partition
 
 DataChunk = List[TableDataClass]
 _CHUNK_SIZE = 100
+_HASH_PARTITION_BOUND = re.compile(r"modulus (\d+), remainder (\d+)")
+
+
+class PartitioningError(Exception):
+    pass
 
 
 class SQLiteExtractor:
@@ -38,11 +45,11 @@ class PostgresLoader:
     def __init__(self, conn):
         self._curs = conn.cursor()
 
-    def load_to_table(self, table: Table, data_chunk: DataChunk) -> None:
+    def load_to_table(self, table: Table, data_chunk: DataChunk, partition: Optional[Partition] = None) -> None:
         column_names = ", ".join([field.name for field in fields(table.dataclass)])
         data = [astuple(item) for item in data_chunk]
         insert_query = f"""
-            INSERT INTO content.{table.name} ({column_names})
+            INSERT INTO content.{partition.name if partition else table.name} ({column_names})
             VALUES %s
             ON CONFLICT DO NOTHING
         """
@@ -50,3 +57,48 @@ class PostgresLoader:
 
     def truncate_table(self, table: Table) -> None:
         self._curs.execute(f"TRUNCATE content.{table.name} CASCADE")
+
+    def set_constraints_immediate(self) -> None:
+        """Check deferrable foreign keys on insert, so bad rows fail before any commit"""
+        self._curs.execute("SET CONSTRAINTS ALL IMMEDIATE")
+
+    def get_partitions(self, table: Table) -> List[Partition]:
+        self._curs.execute("""
+            SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+            FROM pg_inherits
+            JOIN pg_class AS child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = %s::regclass
+            ORDER BY child.relname
+        """, (f"content.{table.name}",))
+        partitions = []
+        for name, bound in self._curs.fetchall():
+            hash_bound = _HASH_PARTITION_BOUND.search(bound)
+            if hash_bound is None:
+                raise PartitioningError(f"Partition {name} of table {table.name} is not a hash partition: {bound}")
+            modulus, remainder = hash_bound.groups()
+            partitions.append(Partition(name, int(modulus), int(remainder)))
+        return partitions
+
+    def split_by_partition(self, table: Table, partitions: List[Partition],
+                           data_chunk: DataChunk) -> Dict[Partition, DataChunk]:
+        film_work_ids = list({item.film_work_id for item in data_chunk if item.film_work_id is not None})
+        self._curs.execute("""
+            SELECT film_work_id, partition_name
+            FROM unnest(%s::text[]) AS film_work_id,
+                 unnest(%s::text[], %s::int[], %s::int[]) AS bound(partition_name, modulus, remainder)
+            WHERE satisfies_hash_partition(%s::regclass, bound.modulus, bound.remainder, film_work_id::uuid)
+        """, (
+            film_work_ids,
+            [partition.name for partition in partitions],
+            [partition.modulus for partition in partitions],
+            [partition.remainder for partition in partitions],
+            f"content.{table.name}",
+        ))
+        partition_names = dict(self._curs.fetchall())
+        by_name = {partition.name: partition for partition in partitions}
+        chunks = defaultdict(list)
+        for item in data_chunk:
+            # Rows without a film are still sent to a partition, so Postgres rejects them instead of dropping them.
+            partition = by_name.get(partition_names.get(item.film_work_id), partitions[0])
+            chunks[partition].append(item)
+        return chunks
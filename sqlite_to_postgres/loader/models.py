@@ -50,3 +50,10 @@ TableDataClass = Union[Filmwork, Person, Genre, GenreFilmwork, PersonFilmwork]
 class Table:
     name: str
     dataclass: TableDataClass
+
+
+@dataclass(frozen=True)
+class Partition:
+    name: str
+    modulus: int
+    remainder: int